@@ -1,72 +1,174 @@
 """Main module for YouTube Video Downloader."""
 
 import argparse
+import asyncio
+import json
 import os
+import re
 import shutil
 import sys
-
-import yt_dlp
-from dotenv import load_dotenv
-
-
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from functools import lru_cache, partial
+from pathlib import Path
+
+# Minimum interval between progress line updates, in seconds
+PROGRESS_INTERVAL = 0.1
+# Parallel downloads print one full line per update, so they report less often
+PARALLEL_PROGRESS_INTERVAL = 5.0
+# Time of the last progress update, keyed by the file being downloaded
+_last_progress_print = {}
+# Set on Ctrl+C to make running worker threads abort their downloads
+_cancel_downloads = threading.Event()
+
+# On-disk cache for video metadata, keyed by YouTube video id
+CACHE_DIR = Path.home() / ".cache" / "yt-downloader"
+CACHE_TTL = 3600
+VIDEO_ID_PATTERN = re.compile(r"(?:v=|youtu\.be/|shorts/)([\w-]{11})")
+
+
+@lru_cache(maxsize=1)
 def is_ffmpeg_available():
     """Check if ffmpeg is installed and available in PATH."""
     return shutil.which("ffmpeg") is not None
 
 
+def find_env_file():
+    """Find .env file in the script directory or any of its parents."""
+    for directory in Path(__file__).resolve().parents:
+        env_path = directory / ".env"
+        if env_path.is_file():
+            return env_path
+    return None
+
+
 def load_config():
     """Load configuration from .env file."""
-    load_dotenv()
+    env_path = find_env_file()
+    if env_path:
+        with open(env_path, encoding="utf-8") as f:
+            for line in f:
+                line = line.strip()
+                if line and not line.startswith("#") and "=" in line:
+                    key, value = line.split("=", 1)
+                    # Variables already set in the environment take precedence
+                    os.environ.setdefault(key.strip(), value.strip().strip("\"'"))
+
     download_dir = os.getenv("DOWNLOAD_DIR", "./downloads")
     return {"download_dir": download_dir}
 
 
+def positive_int(value):
+    """Parse a positive integer command line value."""
+    try:
+        number = int(value)
+    except ValueError:
+        raise argparse.ArgumentTypeError(f"invalid integer value: '{value}'") from None
+    if number < 1:
+        raise argparse.ArgumentTypeError(f"must be a positive integer, got {number}")
+    return number
+
+
 def parse_arguments():
     """Parse command line arguments."""
     parser = argparse.ArgumentParser(
         description="YouTube Video Downloader - Download videos with quality selection"
     )
-    parser.add_argument("--url", type=str, help="YouTube video URL")
+    parser.add_argument("--url", type=str, nargs="+", help="YouTube video URL(s)")
     parser.add_argument(
         "--quality", type=str, help="Video quality (e.g., '720p' or format index)"
     )
+    parser.add_argument(
+        "--concurrency",
+        type=positive_int,
+        default=8,
+        help="Number of videos and fragments downloaded in parallel",
+    )
     return parser.parse_args()
 
 
-def get_video_info(url):
+def extract_video_id(url):
+    """Extract YouTube video id from URL, or None if it cannot be found."""
+    match = VIDEO_ID_PATTERN.search(url)
+    return match.group(1) if match else None
+
+
+def load_cached_info(video_id, has_ffmpeg):
+    """Load video information from the on-disk cache if it is still fresh."""
+    try:
+        with open(CACHE_DIR / f"{video_id}.json", encoding="utf-8") as f:
+            entry = json.load(f)
+    except (OSError, ValueError):
+        return None
+
+    # Treat hand-edited or older-schema entries as a cache miss
+    if not (
+        isinstance(entry, dict)
+        and isinstance(entry.get("title"), str)
+        and isinstance(entry.get("formats"), list)
+        and isinstance(entry.get("ts"), int | float)
+        and all(
+            isinstance(fmt, dict) and "format_id" in fmt and "resolution" in fmt
+            for fmt in entry["formats"]
+        )
+    ):
+        return None
+
+    # Format ids depend on ffmpeg availability, so entries built without it are stale
+    if entry.get("has_ffmpeg") != has_ffmpeg or time.time() - entry["ts"] > CACHE_TTL:
+        return None
+    return {"title": entry["title"], "formats": entry["formats"]}
+
+
+def save_cached_info(video_id, has_ffmpeg, video_info):
+    """Save video information to the on-disk cache, ignoring write errors."""
+    entry = {**video_info, "has_ffmpeg": has_ffmpeg, "ts": time.time()}
+    try:
+        CACHE_DIR.mkdir(parents=True, exist_ok=True)
+        with open(CACHE_DIR / f"{video_id}.json", "w", encoding="utf-8") as f:
+            json.dump(entry, f)
+    except OSError:
+        pass
+
+
+@lru_cache(maxsize=128)
+def get_video_info(url, has_ffmpeg):
     """Extract video information and available formats."""
+    video_id = extract_video_id(url)
+    if video_id:
+        cached = load_cached_info(video_id, has_ffmpeg)
+        if cached:
+            return cached
+
+    # Imported lazily: yt_dlp is slow to import and not needed for --help
+    import yt_dlp
+
     ydl_opts = {
         "quiet": True,
         "no_warnings": True,
     }
 
-    has_ffmpeg = is_ffmpeg_available()
-    if not has_ffmpeg:
-        print("\nWarning: ffmpeg not found. Install ffmpeg for better quality.\n")
-
     try:
         with yt_dlp.YoutubeDL(ydl_opts) as ydl:
             info = ydl.extract_info(url, download=False)
 
-            # Collect available heights
-            heights = set()
+            if has_ffmpeg:
+                format_template = "bestvideo[height<={h}]+bestaudio/best[height<={h}]"
+            else:
+                format_template = "best[height<={h}]"
+
+            # Collect format options keyed by height in a single pass
+            by_height = {}
             for f in info.get("formats", []):
-                if f.get("vcodec") != "none" and f.get("height"):
-                    heights.add(f.get("height"))
-
-            # Create format options
-            formats = []
-            for height in sorted(heights, reverse=True):
-                if has_ffmpeg:
-                    format_id = f"bestvideo[height<={height}]+bestaudio/best[height<={height}]"
-                else:
-                    format_id = f"best[height<={height}]"
-
-                formats.append({
-                    "format_id": format_id,
-                    "resolution": f"{height}p",
-                    "height": height,
-                })
+                height = f.get("height")
+                if f.get("vcodec") != "none" and height and height not in by_height:
+                    by_height[height] = format_template.format(h=height)
+
+            formats = [
+                {"format_id": format_id, "resolution": f"{height}p", "height": height}
+                for height, format_id in sorted(by_height.items(), reverse=True)
+            ]
 
             # Add "best" option at the top
             if formats:
@@ -78,10 +180,21 @@ def get_video_info(url):
                     "height": best_height + 1,
                 })
 
-            return {"title": info.get("title", "video"), "formats": formats}
+            video_info = {"title": info.get("title", "video"), "formats": formats}
     except Exception as e:
         raise ValueError(f"Failed to fetch video info: {e}") from e
 
+    if video_id:
+        save_cached_info(video_id, has_ffmpeg, video_info)
+    return video_info
+
+
+def get_video_infos(urls, has_ffmpeg, max_workers=8):
+    """Extract video information for several URLs concurrently, preserving order."""
+    # Each call builds its own YoutubeDL, so workers never share an instance
+    with ThreadPoolExecutor(max_workers=max_workers) as executor:
+        return list(executor.map(lambda url: get_video_info(url, has_ffmpeg), urls))
+
 
 def select_quality(formats, quality_arg=None):
     """Select video quality interactively or from argument."""
@@ -90,21 +203,21 @@ def select_quality(formats, quality_arg=None):
 
     # If quality specified in CLI
     if quality_arg:
-        for fmt in formats:
-            if quality_arg.lower() in fmt["resolution"].lower():
-                return fmt["format_id"]
-        try:
+        # Numeric index takes precedence, so "1" is not matched against "1080p"
+        if quality_arg.isdecimal():
             index = int(quality_arg) - 1
             if 0 <= index < len(formats):
                 return formats[index]["format_id"]
-        except ValueError:
-            pass
+        quality_lower = quality_arg.lower()
+        for fmt in formats:
+            if quality_lower in fmt["resolution"].lower():
+                return fmt["format_id"]
         print(f"Quality '{quality_arg}' not found. Available options:")
 
     # Interactive selection
-    print("\nAvailable video qualities:")
-    for i, fmt in enumerate(formats, 1):
-        print(f"{i}. {fmt['resolution']}")
+    lines = ["Available video qualities:"]
+    lines.extend(f"{i}. {fmt['resolution']}" for i, fmt in enumerate(formats, 1))
+    sys.stdout.write("\n" + "\n".join(lines) + "\n")
 
     while True:
         try:
@@ -118,61 +231,133 @@ def select_quality(formats, quality_arg=None):
             continue
 
 
-def progress_hook(d):
-    """Display download progress."""
+def progress_hook(d, parallel=False):
+    """Display download progress, with one labelled line per update when parallel."""
+    if _cancel_downloads.is_set():
+        from yt_dlp.utils import DownloadCancelled
+
+        raise DownloadCancelled()
+
+    filename = d.get("filename")
     if d["status"] == "downloading":
+        interval = PARALLEL_PROGRESS_INTERVAL if parallel else PROGRESS_INTERVAL
+        now = time.monotonic()
+        if now - _last_progress_print.get(filename, 0.0) < interval:
+            return
+        _last_progress_print[filename] = now
         percent = d.get("_percent_str", "0%")
         speed = d.get("_speed_str", "N/A")
         eta = d.get("_eta_str", "N/A")
-        print(f"\r[download] {percent} at {speed} ETA {eta}", end="")
+        if parallel:
+            title = d.get("info_dict", {}).get("title", filename)
+            print(f"[download] {title}: {percent} at {speed} ETA {eta}")
+        else:
+            print(f"\r[download] {percent} at {speed} ETA {eta}", end="")
     elif d["status"] == "finished":
-        print(f"\n[download] Download completed: {d['filename']}")
+        _last_progress_print.pop(filename, None)
+        sys.stdout.write(f"\n[download] Download completed: {d['filename']}\n")
 
 
-def download_video(url, format_id, download_dir, title):
-    """Download video with specified format."""
-    os.makedirs(download_dir, exist_ok=True)
-
-    ydl_opts = {
+def build_download_options(format_id, download_dir, concurrency=8, parallel=False):
+    """Build yt_dlp options shared by all downloads in a run."""
+    # Parallel downloads of different videos with the same title would write
+    # to the same file, so the video id is added to keep their paths apart
+    filename = "%(title)s [%(id)s].%(ext)s" if parallel else "%(title)s.%(ext)s"
+    return {
         "format": format_id,
-        "outtmpl": os.path.join(download_dir, "%(title)s.%(ext)s"),
-        "progress_hooks": [progress_hook],
+        "outtmpl": os.path.join(download_dir, filename),
+        "progress_hooks": [partial(progress_hook, parallel=parallel)],
+        # progress_hook does the reporting; yt_dlp's own status line would duplicate it
+        "noprogress": True,
         "merge_output_format": "mp4",
+        "concurrent_fragment_downloads": concurrency,
+        "http_chunk_size": 10 * 1024 * 1024,
+        "retries": 3,
+        "fragment_retries": 3,
     }
 
+
+def download_video(url, ydl_opts, title):
+    """Download a single video with prebuilt options."""
+    import yt_dlp
+
     try:
-        with yt_dlp.YoutubeDL(ydl_opts) as ydl:
+        # YoutubeDL updates its params in place, so each instance gets its own copy
+        with yt_dlp.YoutubeDL(dict(ydl_opts)) as ydl:
             print(f"\nDownloading: {title}")
-            print(f"Saving to: {download_dir}\n")
             ydl.download([url])
             return True
+    except yt_dlp.utils.DownloadCancelled:
+        return False
     except Exception as e:
         print(f"\nError during download: {e}")
         return False
 
 
+async def _download_one(url, ydl_opts, title, semaphore):
+    """Download a single video in a worker thread once the semaphore allows."""
+    async with semaphore:
+        return await asyncio.to_thread(download_video, url, ydl_opts, title)
+
+
+async def download_all(urls, ydl_opts, titles, concurrency=8):
+    """Download videos in parallel, at most `concurrency` at a time."""
+    _cancel_downloads.clear()
+    semaphore = asyncio.Semaphore(concurrency)
+    try:
+        results = await asyncio.gather(*(
+            _download_one(url, ydl_opts, title, semaphore)
+            for url, title in zip(urls, titles, strict=True)
+        ))
+    except asyncio.CancelledError:
+        # Worker threads cannot be cancelled, so make them abort on their next
+        # progress update; asyncio.run() waits for them before re-raising Ctrl+C
+        _cancel_downloads.set()
+        raise
+    return all(results)
+
+
 def main():
     """Main entry point for the YouTube downloader."""
     try:
         args = parse_arguments()
         config = load_config()
         download_dir = config["download_dir"]
+        os.makedirs(download_dir, exist_ok=True)
 
-        url = args.url
-        if not url:
-            url = input("Enter YouTube video URL: ").strip()
+        urls = args.url
+        if not urls:
+            urls = input("Enter YouTube video URL(s): ").split()
 
-        if not url:
+        if not urls:
             print("Error: URL is required")
             return 1
 
+        # Downloading the same video twice in parallel would corrupt the shared file
+        unique_urls = {}
+        for url in urls:
+            unique_urls.setdefault(extract_video_id(url) or url, url)
+        urls = list(unique_urls.values())
+
+        has_ffmpeg = is_ffmpeg_available()
+        if not has_ffmpeg:
+            print("\nWarning: ffmpeg not found. Install ffmpeg for better quality.\n")
+
         print("\nFetching video information...")
-        video_info = get_video_info(url)
+        video_infos = get_video_infos(urls, has_ffmpeg)
+        titles = [video_info["title"] for video_info in video_infos]
+
+        for title in titles:
+            print(f"\nVideo: {title}")
 
-        print(f"\nVideo: {video_info['title']}")
+        # Format ids are height-based selectors, so the choice made for the
+        # first video applies to the whole batch
+        format_id = select_quality(video_infos[0]["formats"], args.quality)
+        parallel = len(urls) > 1 and args.concurrency > 1
+        ydl_opts = build_download_options(format_id, download_dir, args.concurrency, parallel)
 
-        format_id = select_quality(video_info["formats"], args.quality)
-        success = download_video(url, format_id, download_dir, video_info["title"])
+        print(f"\nSaving to: {download_dir}\n")
+        success = asyncio.run(download_all(urls, ydl_opts, titles, args.concurrency))
 
         return 0 if success else 1
 